@@ -1,55 +1,97 @@
-import base64
+import functools
 import inspect
-import json
+import logging
 import os
 import traceback
-from typing import Any, Dict, Optional
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Union
 
+import msgspec
 from remote import Remote
 from secret import ACCESS_TOKEN_MAP, AccessTokenInfo
-from typedefs import (
-    DeleteFileRequest,
-    GetFileContentRequest,
-    RenameFileRequest,
-    UpdateFilesRequest,
-)
+from typedefs import BatchRequest, RenameFileRequest, UpdateFilesRequest
+
+try:
+    # SIMD-accelerated; matters for large file blobs
+    import pybase64 as b64
+except ImportError:
+    import base64 as b64
+
+try:
+    import orjson
+
+    def _dumps(body: Any) -> str:
+        # Must stay a str: the Lambda runtime JSON-encodes the whole response
+        # dict and cannot serialize bytes, and base64-wrapping JSON to avoid
+        # this decode would cost more than it saves
+        return orjson.dumps(body).decode("utf-8")
+
+except ImportError:
+    try:
+        from ujson import dumps as _dumps
+    except ImportError:
+        import json
+
+        # Built once so each call skips option handling; compact like orjson
+        _dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
 
 # CORS settings
 CORS_HEADERS = {
     # This should get set automatically by API Gateway anyway
     "Access-Control-Allow-Origin": os.environ.get("CORS_ALLOW_ORIGIN", "*"),
-    "Access-Control-Allow-Methods": "GET,POST,PUT,OPTIONS",
+    "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS",
     "Access-Control-Allow-Headers": "Content-Type,Authorization",
 }
 
-# Cache across Lambda invocations
-_REMOTES: dict[str, Remote] = {}
+# Shared across responses; never mutate these
+_BASE_HEADERS = {"Content-Type": "application/json", **CORS_HEADERS}
+_BLOB_HEADERS = {"Content-Type": "application/octet-stream", **CORS_HEADERS}
 
+# Preflights are frequent and identical, so build the response once and let
+# browsers cache it
+_CORS_PREFLIGHT_RESPONSE = {
+    "statusCode": 204,
+    "headers": {**_BASE_HEADERS, "Access-Control-Max-Age": "86400"},
+    "body": "",
+}
 
-def _get_remote(token_info: AccessTokenInfo) -> Remote:
-    if token_info["token"] not in _REMOTES:
-        _REMOTES[token_info["token"]] = Remote(
-            token_info["remote_uri"],
-            ref=token_info["git_ref"],
-            token=token_info["github_token"],
-            author_name=token_info["author_name"],
-            author_email=token_info["author_email"],
-        )
-
-    return _REMOTES[token_info["token"]]
+# Include full tracebacks in error responses only when debugging
+DEBUG = os.environ.get("DEBUG") == "1"
+
+# Fetch every configured remote during Lambda init rather than on first request
+PREWARM_REMOTES = os.environ.get("PREWARM_REMOTES") == "1"
+
+# Cache across Lambda invocations. Only called with tokens present in
+# ACCESS_TOKEN_MAP, so unknown tokens can't evict real remotes.
+@functools.lru_cache(maxsize=32)
+def _get_remote(access_token: str) -> Remote:
+    token_info: AccessTokenInfo = ACCESS_TOKEN_MAP[access_token]
+    return Remote(
+        token_info["remote_uri"],
+        ref=token_info["git_ref"],
+        token=token_info["github_token"],
+        author_name=token_info["author_name"],
+        author_email=token_info["author_email"],
+    )
 
 
 def _json_response(
-    status: int, body: Any = {}, extra_headers: Dict[str, str] = {}
+    status: int,
+    body: Any = None,
+    extra_headers: Optional[Dict[str, str]] = None,
 ) -> Dict[str, Any]:
     return {
         "statusCode": status,
-        "headers": {
-            "Content-Type": "application/json",
-            **CORS_HEADERS,
-            **extra_headers,
-        },
-        "body": json.dumps(body),
+        "headers": (
+            {**_BASE_HEADERS, **extra_headers} if extra_headers else _BASE_HEADERS
+        ),
+        # The frontend parses every response as JSON, so empty bodies are "{}"
+        "body": "{}" if body is None else _dumps(body),
     }
 
 
@@ -57,32 +99,58 @@ def _error_response(status: int, message: str):
     return _json_response(status, {"error": message})
 
 
-def _blob_response(body: bytes):
+def _key_error_response(status: int, e: KeyError, **extra: Any):
+    # Formatting a traceback walks every frame, so skip it unless it will be shown
+    logger.warning("Request failed with %d: %s", status, e.args[0])
+    message = traceback.format_exc() if DEBUG else e.args[0]
+    return _json_response(status, {"error": message, **extra})
+
+
+def _blob_response(body: Union[bytes, memoryview]):
     return {
         "statusCode": 200,
-        "headers": {"Content-Type": "application/octet-stream", **CORS_HEADERS},
-        "body": base64.b64encode(body).decode("utf-8"),
+        "headers": _BLOB_HEADERS,
+        "body": b64.b64encode(body).decode("ascii"),
         "isBase64Encoded": True,
     }
 
 
-def _get_body(event: Dict[str, Any]) -> str:
-    body = event.get("body", "")
+def _get_body(event: Dict[str, Any]) -> Union[str, bytes]:
+    body = event.get("body") or ""
     # API Gateway might base64-encode the body; note that all blobs will already be base64-encoded by frontend.
-    return (
-        base64.b64decode(body).decode("utf-8", errors="replace")
-        if event.get("isBase64Encoded")
-        else body
-    )
+    # Decoded bytes are handed straight to pydantic, which validates UTF-8 itself.
+    return b64.b64decode(body) if event.get("isBase64Encoded") else body
+
+
+_HEALTH_RESPONSE = _json_response(200, {"status": "ok"})
+
+
+def _handle_health() -> Dict[str, Any]:
+    return _HEALTH_RESPONSE
+
+
+# Remote.ls() returns the same dict until the tree changes, so its encoded
+# response can be reused until then
+_LS_RESPONSES: "weakref.WeakKeyDictionary[Remote, tuple[dict, Dict[str, Any]]]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
-def _handle_ls(r: Remote) -> Dict[str, Any]:
-    return _json_response(200, {"files": r.ls()})
+def _handle_ls(query: Dict[str, str], r: Remote) -> Dict[str, Any]:
+    files = r.ls()
+    cached = _LS_RESPONSES.get(r)
+    if cached is None or cached[0] is not files:
+        cached = _LS_RESPONSES[r] = (files, _json_response(200, {"files": files}))
+    return cached[1]
 
 
-def _handle_get(body: GetFileContentRequest, r: Remote) -> Dict[str, Any]:
+def _handle_get(query: Dict[str, str], r: Remote) -> Dict[str, Any]:
+    path = query.get("path")
+    if not path:
+        return _error_response(400, "Missing path")
+
     try:
-        return _blob_response(r.get(body.path))
+        return _blob_response(r.get_buffer(path))
     except KeyError:
         return _json_response(404)
 
@@ -91,17 +159,29 @@ def _handle_update(body: UpdateFilesRequest, r: Remote) -> Dict[str, Any]:
     try:
         r.update(body.files, message=body.message)
         return _json_response(200)
-    except KeyError:
+    except KeyError as e:
         # E.g., an intermediate component is not a directory
-        return _json_response(400, {"error": traceback.format_exc()})
+        return _key_error_response(400, e)
 
 
-def _handle_delete(body: DeleteFileRequest, r: Remote) -> Dict[str, Any]:
+def _handle_batch(body: BatchRequest, r: Remote) -> Dict[str, Any]:
     try:
-        r.delete(body.path)
+        r.apply_batch(body.ops, message=body.message)
         return _json_response(200)
     except KeyError as e:
-        return _json_response(404, {"error": traceback.format_exc(), "path": body.path})
+        return _key_error_response(400, e)
+
+
+def _handle_delete(query: Dict[str, str], r: Remote) -> Dict[str, Any]:
+    path = query.get("path")
+    if not path:
+        return _error_response(400, "Missing path")
+
+    try:
+        r.delete(path)
+        return _json_response(200)
+    except KeyError as e:
+        return _key_error_response(404, e, path=path)
 
 
 def _handle_move(body: RenameFileRequest, r: Remote) -> Dict[str, Any]:
@@ -114,23 +194,45 @@ def _handle_move(body: RenameFileRequest, r: Remote) -> Dict[str, Any]:
             fail_if_exists=body.fail_if_exists,
         )
         return _json_response(200)
-    except KeyError:
-        return _json_response(400, {"error": traceback.format_exc()})
+    except KeyError as e:
+        return _key_error_response(400, e)
+
 
+# These routes don't require authentication
+PUBLIC_ROUTES = {
+    ("GET", "/health"): _handle_health,
+}
+
+# These routes take query string parameters and skip body parsing entirely
+QUERY_ROUTES = {
+    ("GET", "/files"): _handle_ls,
+    ("GET", "/file"): _handle_get,
+    ("DELETE", "/file"): _handle_delete,
+}
 
-ROUTES = {
-    "GET /files": _handle_ls,
-    "GET /file": _handle_get,
-    "POST /file": _handle_update,
-    "DELETE /file": _handle_delete,
-    "POST /file/rename": _handle_move,
+BODY_ROUTES = {
+    ("PUT", "/file"): _handle_update,
+    ("POST", "/file"): _handle_update,
+    ("POST", "/file/rename"): _handle_move,
+    ("POST", "/files/batch"): _handle_batch,
 }
 
 
-def call(function, event, remote):
-    payload_type = inspect.signature(function).parameters["body"].annotation
-    body = payload_type.model_validate_json(_get_body(event))
-    return function(body, remote)
+def _decoder(payload_type):
+    if issubclass(payload_type, msgspec.Struct):
+        return msgspec.json.Decoder(payload_type).decode
+    return payload_type.model_validate_json
+
+
+# Resolved once at import time rather than inspecting handlers on every request
+ROUTE_DECODERS = {
+    key: _decoder(inspect.signature(function).parameters["body"].annotation)
+    for key, function in BODY_ROUTES.items()
+}
+
+
+def call(function, decode, event, remote):
+    return function(decode(_get_body(event)), remote)
 
 
 def auth(event):
@@ -139,24 +241,67 @@ def auth(event):
         return None
 
     access_token = auth_header[len("Bearer ") :].strip()
-    token_info = ACCESS_TOKEN_MAP.get(access_token)
-    return _get_remote(token_info) if token_info else None
+    return _get_remote(access_token) if access_token in ACCESS_TOKEN_MAP else None
 
 
 def handler(event, context) -> Dict[str, Any]:
     http_method = (event.get("httpMethod") or "").upper()
-    path = event.get("path") or "/"
 
     # CORS preflight
     if http_method == "OPTIONS":
-        return _json_response(204)
+        return _CORS_PREFLIGHT_RESPONSE
+
+    handler_key = (http_method, event.get("path") or "/")
+    public_function = PUBLIC_ROUTES.get(handler_key)
+    if public_function is not None:
+        return public_function()
 
     remote = auth(event)
     if not remote:
         return _error_response(401, "Unauthorized")
 
-    handler_key = f"{http_method} {path}"
-    if handler_key not in ROUTES:
+    query_function = QUERY_ROUTES.get(handler_key)
+    if query_function is not None:
+        return query_function(event.get("queryStringParameters") or {}, remote)
+
+    function = BODY_ROUTES.get(handler_key)
+    if function is None:
         return _error_response(404, "Not Found")
 
-    return call(ROUTES[handler_key], event, remote)
+    return call(function, ROUTE_DECODERS[handler_key], event, remote)
+
+
+def _prewarm_remote(access_token: str) -> None:
+    # One unreachable repo must not fail init for every token; a failed remote
+    # is left out of the cache and built again on its first request
+    try:
+        _get_remote(access_token)
+    except Exception:
+        logger.exception(
+            "Failed to prewarm %s", ACCESS_TOKEN_MAP[access_token]["remote_uri"]
+        )
+
+
+def _prewarm_remotes() -> None:
+    # Fetches are network-bound, so run them concurrently. Tokens sharing a
+    # repository also share its directory on disk and must not fetch into it
+    # at the same time, so only the first token per repository goes in the pool.
+    first_tokens: Dict[tuple, str] = {}
+    other_tokens = []
+    for access_token, token_info in ACCESS_TOKEN_MAP.items():
+        key = (token_info["remote_uri"], token_info["git_ref"])
+        if key in first_tokens:
+            other_tokens.append(access_token)
+        else:
+            first_tokens[key] = access_token
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(_prewarm_remote, first_tokens.values()))
+
+    for access_token in other_tokens:
+        _prewarm_remote(access_token)
+
+
+# Runs in a function so no token is left behind in module globals
+if PREWARM_REMOTES:
+    _prewarm_remotes()
@@ -1,14 +1,95 @@
-import base64
+import functools
+import hashlib
+import logging
+import os
+import shutil
+import stat
+import sys
 import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
 from typing import Optional, cast
 
 import pygit2
-from typedefs import FileUpdate
+from typedefs import BatchOp, FileUpdate
+
+try:
+    import pybase64 as b64
+except ImportError:
+    import base64 as b64
+
+logger = logging.getLogger(__name__)
+
+# Bounds for the per-Remote cache of recently read file contents
+GET_CACHE_MAX_ENTRIES = 64
+GET_CACHE_MAX_BYTES = 4 * 1024 * 1024
+# Bound for the per-Remote cache of listed subtrees, keyed by tree OID
+TREE_DICT_CACHE_MAX_ENTRIES = 4096
+
+# Parent directory for the bare repos. Point this at a tmpfs such as /dev/shm
+# to make object writes memory-speed, if it has room for the whole checkout.
+REPO_BASE_DIR = os.environ.get("NOTES_EDITOR_TMPDIR") or tempfile.gettempdir()
+
+# Tip commit OID per (repo path, ref). Remotes for the same uri and ref share
+# a repo on disk, so this is module-level rather than per Remote.
+_TIP_OIDS: "dict[tuple[str, str], pygit2.Oid]" = {}
+
+try:
+    _OPEN_NO_SEARCH = pygit2.enums.RepositoryOpenFlag.NO_SEARCH
+except AttributeError:
+    # pygit2 < 1.14
+    _OPEN_NO_SEARCH = pygit2.GIT_REPOSITORY_OPEN_NO_SEARCH  # type: ignore
 
 GITMODE_TREE = pygit2.GIT_FILEMODE_TREE  # type: ignore
 GITMODE_FILE = pygit2.GIT_FILEMODE_BLOB  # type: ignore
 
 
+def _make_private_dir(path: str) -> str:
+    """
+    Create `path` with owner-only permissions and return it. If something else
+    claims the path first, return a fresh private directory instead.
+    """
+    try:
+        os.mkdir(path, 0o700)
+        return path
+    except FileExistsError:
+        return tempfile.mkdtemp(prefix="stateless-bare-", dir=REPO_BASE_DIR)
+
+
+def _private_repo_dir(path: str) -> str:
+    """
+    Return a directory at `path` that only this user can have written to.
+    The path is predictable and usually sits in a shared directory, so a path
+    owned by another user is left alone and a fresh directory is used instead.
+    Anything of ours that is not a private directory is replaced.
+    """
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return _make_private_dir(path)
+
+    if st.st_uid != os.getuid():
+        logger.warning("%s is owned by another user; not reusing it", path)
+        return tempfile.mkdtemp(prefix="stateless-bare-", dir=REPO_BASE_DIR)
+
+    if not stat.S_ISDIR(st.st_mode):
+        os.unlink(path)
+        return _make_private_dir(path)
+
+    if st.st_mode & 0o077:
+        shutil.rmtree(path)
+        return _make_private_dir(path)
+
+    return path
+
+
+@functools.lru_cache(maxsize=4096)
+def _split_path(path: str) -> tuple[str, ...]:
+    # Clients edit the same few paths repeatedly, so split each one once and
+    # intern its components, which then serve as trie keys in _write_tree
+    return tuple(sys.intern(p) for p in path.split("/") if p)
+
+
 class Remote:
     def __init__(
         self,
@@ -21,7 +102,9 @@ class Remote:
         """
         Stateless Git remote viewer/editor built on libgit2 (pygit2).
 
-        - Creates a bare repo in a temp dir (no checkout).
+        - Creates a bare repo in a temp dir (no checkout). The path is derived from
+          the uri and ref, so a runtime restarted on the same worker reuses it,
+          as long as it is private to this user and its origin is still `uri`.
         - Shallow-fetches a single ref (depth=1).
         - Works best for read-mostly UIs; pushes minimal objects for edits.
 
@@ -29,8 +112,21 @@ class Remote:
         """
         self.uri = uri
         self.ref = ref
-        self._tmpdir = tempfile.mkdtemp(prefix="stateless-bare-")
-        self.repo = pygit2.init_repository(self._tmpdir, bare=True)
+        digest = hashlib.sha1(f"{uri}\0{ref}".encode("utf-8")).hexdigest()[:16]
+        self._tmpdir = _private_repo_dir(
+            os.path.join(REPO_BASE_DIR, f"stateless-bare-{digest}")
+        )
+        try:
+            # Without NO_SEARCH an empty cache dir inside some other clone would
+            # open that clone, and its refs would be reset and pushed from
+            self.repo = pygit2.Repository(self._tmpdir, _OPEN_NO_SEARCH)
+            # The token is sent to origin, so never trust a URL left on disk
+            if self.repo.remotes["origin"].url != uri:
+                raise ValueError("origin does not match uri")
+        except (pygit2.GitError, KeyError, ValueError):
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = _make_private_dir(self._tmpdir)
+            self.repo = pygit2.init_repository(self._tmpdir, bare=True)
 
         # Create/lookup remote
         try:
@@ -48,25 +144,45 @@ class Remote:
         self.author_name = author_name
         self.author_email = author_email
 
+        self._in_transaction = False
+        self._tip_key = (self._tmpdir, self.ref)
+        self._tip: Optional[pygit2.Commit] = None
+
+        # (tree OID, ls() result) for the most recently listed tree
+        self._ls_cache: Optional[tuple[pygit2.Oid, dict[str, Optional[dict]]]] = None
+        # tree OID -> _tree_to_dict() result, shared between listings
+        self._tree_dict_cache: dict[pygit2.Oid, dict[str, Optional[dict]]] = {}
+        # (tree OID, path) -> file content, least recently used first
+        self._get_cache: "OrderedDict[tuple[pygit2.Oid, str], memoryview]" = (
+            OrderedDict()
+        )
+        self._get_cache_bytes = 0
+
         # Ensure we have a local ref pointing at the fetched tip
         self._ensure_tracking_ref()
 
     def _ensure_tracking_ref(self):
         remote_ref = f"refs/remotes/origin/{self.ref.split('/')[-1]}"
-        # If refs/heads/<name> is missing, create it at the remote tip
-        if self.ref not in self.repo.references:
-            if remote_ref not in self.repo.references:
-                # Fall back to reading FETCH_HEAD
-                fetch_head = self.repo.lookup_reference("FETCH_HEAD").target
-                self.repo.references.create(self.ref, fetch_head, force=True)
-            else:
-                self.repo.references.create(
-                    self.ref, self.repo.lookup_reference(remote_ref).target, force=True
-                )
+        # Point refs/heads/<name> at the remote tip; a reused repo may have a stale one
+        if remote_ref not in self.repo.references:
+            # Fall back to reading FETCH_HEAD
+            fetch_head = self.repo.lookup_reference("FETCH_HEAD").target
+            self.repo.references.create(self.ref, fetch_head, force=True)
+        else:
+            self.repo.references.create(
+                self.ref, self.repo.lookup_reference(remote_ref).target, force=True
+            )
+        _TIP_OIDS.pop(self._tip_key, None)
 
     def _get_tip(self) -> pygit2.Commit:
-        oid = self.repo.lookup_reference(self.ref).target
-        return cast(pygit2.Commit, self.repo[oid])
+        # The local ref only moves through this class, which keeps the cache
+        # current, so it is resolved once per repo
+        oid = _TIP_OIDS.get(self._tip_key)
+        if oid is None:
+            oid = _TIP_OIDS[self._tip_key] = self.repo.lookup_reference(self.ref).target
+        if self._tip is None or self._tip.id != oid:
+            self._tip = cast(pygit2.Commit, self.repo[oid])
+        return self._tip
 
     def _new_commit(
         self, message: str, prev: pygit2.Commit, tree: pygit2.Tree
@@ -75,78 +191,165 @@ class Remote:
         new_commit_oid = self.repo.create_commit(
             self.ref, sig, sig, message, tree.id, [prev.id]
         )
-        return cast(pygit2.Commit, self.repo[new_commit_oid])
+        _TIP_OIDS[self._tip_key] = new_commit_oid
+        self._tip = cast(pygit2.Commit, self.repo[new_commit_oid])
+        return self._tip
 
-    def _tree_to_dict(self, tree: pygit2.Tree) -> dict[str, Optional[dict]]:
-        out: dict[str, Optional[dict]] = {}
-        for entry in tree:
-            if entry.filemode == GITMODE_TREE:
-                subtree = self.repo[entry.id]
-                out[entry.name] = self._tree_to_dict(subtree)  # type: ignore
-            else:
-                out[entry.name] = None  # type: ignore
-        return out
+    def _commit_tree(
+        self, message: str, prev: pygit2.Commit, tree_oid: pygit2.Oid, push: bool
+    ) -> str:
+        # Saving identical content (e.g. an autosave) leaves the tree as it was;
+        # skip the empty commit and the push round-trip
+        if tree_oid == prev.tree_id:
+            return str(prev.id)
 
-    def _deep_update(
-        self, base_tree: pygit2.Tree, parts: list[str], update: dict
-    ) -> pygit2.Oid:
-        """Recurs down tree with DFS, returning OID of updated tree."""
-
-        if len(parts) == 1:
-            if update["type"] == "delete":
-                filename = parts[0]
-                print(f"Deleting {filename}")
-                builder = self.repo.TreeBuilder(base_tree)
-                builder.remove(filename)
-                return builder.write()
-            elif update["type"] == "insert":
-                filename = parts[0]
-                file_exists = filename in {e.name for e in base_tree}
-                if update.get("fail_if_not_exists") and not file_exists:
-                    raise KeyError(f"File not found: {filename}")
-                if update.get("fail_if_exists") and file_exists:
-                    raise KeyError(f"File already exists: {filename}")
-                print(f"Inserting {filename}")
-                builder = self.repo.TreeBuilder(base_tree)
-                builder.insert(filename, update["blob_oid"], update["mode"])
-                return builder.write()
-
-        next_dir_node = next((e for e in base_tree if e.name == parts[0]), None)
-        if next_dir_node is None:
-            if update["type"] == "delete":
-                raise KeyError(f"Path not found: {'/'.join(parts)}")
-
-            next_dir_oid = self.repo.TreeBuilder().write()
-            next_dir_tree_builder = self.repo.TreeBuilder(base_tree)
-            next_dir_tree_builder.insert(parts[0], next_dir_oid, GITMODE_TREE)
-            updated_base_tree_oid = next_dir_tree_builder.write()
-            base_tree = cast(pygit2.Tree, self.repo[updated_base_tree_oid])
-            next_dir_node = self.repo[next_dir_oid]
-
-            print("Creating tree", parts[0])
-        elif next_dir_node.filemode != GITMODE_TREE:
-            raise KeyError(f"Path component is not a directory: {parts[0]}")
-        else:
-            print("Walking into", parts[0])
+        new_commit = self._new_commit(
+            message, prev, cast(pygit2.Tree, self.repo[tree_oid])
+        )
+        if push:
+            self._push()
 
-        assert isinstance(next_dir_node, pygit2.Tree)
+        return str(new_commit.id)
 
-        new_tree_oid = self._deep_update(next_dir_node, parts[1:], update)
-        builder = self.repo.TreeBuilder(base_tree)
-        builder.insert(parts[0], new_tree_oid, GITMODE_TREE)
-        return builder.write()
+    def _tree_to_dict(self, tree: pygit2.Tree) -> dict[str, Optional[dict]]:
+        """
+        Iterative DFS, so deep trees don't add Python stack frames.
+        Subtrees are memoized by OID, so after an edit only the changed
+        subtrees are walked again. Results are shared and must not be mutated.
+        """
+        cache = self._tree_dict_cache
+        if len(cache) > TREE_DICT_CACHE_MAX_ENTRIES:
+            cache.clear()
+
+        cached = cache.get(tree.id)
+        if cached is not None:
+            return cached
+
+        repo = self.repo
+        root: dict[str, Optional[dict]] = {}
+        cache[tree.id] = root
+        stack = [(tree, root)]
+        while stack:
+            tree, out = stack.pop()
+            for entry in tree:
+                if entry.filemode == GITMODE_TREE:
+                    child = cache.get(entry.id)
+                    if child is None:
+                        child = cache[entry.id] = {}
+                        stack.append((repo[entry.id], child))  # type: ignore
+                    out[entry.name] = child  # type: ignore
+                else:
+                    out[entry.name] = None  # type: ignore
+        return root
+
+    def _write_tree(
+        self, base_tree: pygit2.Tree, updates: list[tuple[str, dict]]
+    ) -> pygit2.Oid:
+        """
+        Applies (path, update) pairs over a trie of the touched paths: each
+        affected directory gets one TreeBuilder and is written once, children
+        before parents. Updates apply in order against the evolving tree.
+        Directories emptied by deletes are dropped. Returns OID of updated tree.
+        """
+        TreeBuilder = self.repo.TreeBuilder
+
+        # Within one trie a name can't be both a file and a directory, so the
+        # updates are split into passes wherever a path was a file target and
+        # is now a directory prefix, or the other way round. Passes run in
+        # order, each on the tree the previous one wrote.
+        passes: list[list[tuple[str, dict, tuple[str, ...]]]] = []
+        file_paths: set[tuple[str, ...]] = set()
+        dir_paths: set[tuple[str, ...]] = set()
+        for path, update in updates:
+            parts = _split_path(path)
+            if not parts:
+                raise KeyError(f"Invalid path: {path}")
+            prefixes = [parts[:i] for i in range(1, len(parts))]
+            if (
+                not passes
+                or parts in dir_paths
+                or any(prefix in file_paths for prefix in prefixes)
+            ):
+                passes.append([])
+                file_paths = set()
+                dir_paths = set()
+            passes[-1].append((path, update, parts))
+            file_paths.add(parts)
+            dir_paths.update(prefixes)
+
+        def build(tree: Optional[pygit2.Tree], node: tuple[dict, dict]):
+            # tree is None for directories that don't exist yet
+            dirs, files = node
+            builder = TreeBuilder(tree) if tree is not None else TreeBuilder()
+
+            for name, child in dirs.items():
+                subtree = None
+                if tree is not None:
+                    try:
+                        subtree = tree[name]
+                    except KeyError:
+                        pass
+
+                if subtree is None:
+                    logger.debug("Creating tree %s", name)
+                elif subtree.filemode != GITMODE_TREE:
+                    raise KeyError(f"Path component is not a directory: {name}")
+                else:
+                    logger.debug("Walking into %s", name)
+
+                child_builder = build(cast(Optional[pygit2.Tree], subtree), child)
+                if len(child_builder) > 0:
+                    builder.insert(name, child_builder.write(), GITMODE_TREE)
+                elif subtree is not None:
+                    logger.debug("Removing empty tree %s", name)
+                    builder.remove(name)
+
+            for name, named_updates in files.items():
+                existed = tree is not None and name in tree
+                exists = existed
+                for path, update in named_updates:
+                    if update["type"] == "delete":
+                        if not exists:
+                            missing = "Path" if tree is None else "File"
+                            raise KeyError(f"{missing} not found: {path}")
+                        exists = False
+                    else:
+                        if update.get("fail_if_not_exists") and not exists:
+                            raise KeyError(f"File not found: {path}")
+                        if update.get("fail_if_exists") and exists:
+                            raise KeyError(f"File already exists: {path}")
+                        exists = True
+
+                if exists:
+                    logger.debug("Inserting %s", name)
+                    update = named_updates[-1][1]
+                    builder.insert(name, update["blob_oid"], update["mode"])
+                elif existed:
+                    logger.debug("Deleting %s", name)
+                    builder.remove(name)
+
+            return builder
+
+        tree = base_tree
+        for pass_updates in passes:
+            # Each trie node is (subdirectories by name, updates by filename)
+            root: tuple[dict, dict] = ({}, {})
+            for path, update, parts in pass_updates:
+                dirs, files = root
+                for part in parts[:-1]:
+                    dirs, files = dirs.setdefault(part, ({}, {}))
+                files.setdefault(parts[-1], []).append((path, update))
+
+            tree = cast(pygit2.Tree, self.repo[build(tree, root).write()])
+
+        return tree.id
 
     def _get_file_blob(self, tree: pygit2.Tree, path: str) -> pygit2.Blob:
-        node = tree
-        parts = [p for p in path.split("/") if p]
-        for part in parts:
-            if not isinstance(node, pygit2.Tree):
-                # should be non-leaf here
-                raise KeyError(f"Path component is not a directory: {part}")
-            try:
-                node = node[part]
-            except KeyError:
-                raise KeyError(f"File not found: {path}")
+        # libgit2 resolves the whole path in a single lookup
+        try:
+            node = tree["/".join(_split_path(path))]
+        except KeyError:
+            raise KeyError(f"File not found: {path}")
 
         if node.filemode != GITMODE_FILE:
             raise KeyError(f"Path is not a file: {path}")
@@ -154,25 +357,86 @@ class Remote:
         return cast(pygit2.Blob, node)
 
     def _push(self):
+        # Commits made inside transaction() are pushed once when it exits
+        if self._in_transaction:
+            return
         self.remote.push([self.ref], callbacks=self.callbacks)
 
     # -----------------------
     # Public API
     # -----------------------
 
+    @contextmanager
+    def transaction(self):
+        """
+        Defer pushes from writes made inside the block and push once on exit,
+        if anything was committed.
+        If the block raises, the local ref is reset and nothing is pushed.
+        Nested transactions join the outermost one.
+        """
+        if self._in_transaction:
+            yield self
+            return
+
+        start = self._get_tip()
+        self._in_transaction = True
+        try:
+            yield self
+        except BaseException:
+            self.repo.references.create(self.ref, start.id, force=True)
+            _TIP_OIDS[self._tip_key] = start.id
+            raise
+        finally:
+            self._in_transaction = False
+
+        # Every write may have been skipped as unchanged
+        if self._get_tip().id != start.id:
+            self._push()
+
     def ls(self) -> dict[str, Optional[dict]]:
-        """Return a nested dict representing the file tree at the tip of self.ref."""
-        commit = self._get_tip()
-        return self._tree_to_dict(commit.tree)
+        """
+        Return a nested dict representing the file tree at the tip of self.ref.
+        The result is cached until the tip's tree changes and must not be mutated.
+        """
+        tree = self._get_tip().tree
+        if self._ls_cache is not None and self._ls_cache[0] == tree.id:
+            return self._ls_cache[1]
+
+        files = self._tree_to_dict(tree)
+        self._ls_cache = (tree.id, files)
+        return files
 
     def get(self, path: str) -> bytes:
         """
         Return file content at given path in the tip commit.
         Raises KeyError if the path is missing or is a directory.
         """
+        return bytes(self.get_buffer(path))
+
+    def get_buffer(self, path: str) -> memoryview:
+        """
+        Like get(), but returns a read-only view of the blob's content without
+        copying it. The view keeps its blob alive and is shared with the cache.
+        """
         commit = self._get_tip()
-        tree = commit.tree
-        return self._get_file_blob(tree, path).data
+        key = (commit.tree_id, path)
+        data = self._get_cache.get(key)
+        if data is not None:
+            self._get_cache.move_to_end(key)
+            return data
+
+        data = memoryview(self._get_file_blob(commit.tree, path))
+        if len(data) <= GET_CACHE_MAX_BYTES:
+            self._get_cache[key] = data
+            self._get_cache_bytes += len(data)
+            while (
+                len(self._get_cache) > GET_CACHE_MAX_ENTRIES
+                or self._get_cache_bytes > GET_CACHE_MAX_BYTES
+            ):
+                _, evicted = self._get_cache.popitem(last=False)
+                self._get_cache_bytes -= len(evicted)
+
+        return data
 
     def update(
         self, updates: list[FileUpdate], message: Optional[str] = None, push=True
@@ -181,35 +445,67 @@ class Remote:
         Create a new commit that updates/creates `path` with `new_content`, then (optionally) push.
         """
         commit = self._get_tip()
-        base_tree = commit.tree
 
+        tree_updates = []
         for update in updates:
-            b64 = update.b64
-            content = update.content.encode("utf-8")
-            blob = content if not b64 else base64.b64decode(content)
-            blob_oid = self.repo.create_blob(blob)
-            new_tree_oid = self._deep_update(
-                base_tree,
-                parts=[p for p in update.path.split("/") if p],
-                update={
-                    "type": "insert",
-                    "blob_oid": blob_oid,
-                    "mode": GITMODE_FILE,
-                    "fail_if_exists": update.fail_if_exists,
-                    "fail_if_not_exists": update.fail_if_not_exists,
-                },
+            # b64decode takes the ASCII str directly; encoding it first would copy it
+            if update.b64:
+                blob = b64.b64decode(update.content)
+            else:
+                blob = update.content.encode("utf-8")
+            tree_updates.append(
+                (
+                    update.path,
+                    {
+                        "type": "insert",
+                        "blob_oid": self.repo.create_blob(blob),
+                        "mode": GITMODE_FILE,
+                        "fail_if_exists": update.fail_if_exists,
+                        "fail_if_not_exists": update.fail_if_not_exists,
+                    },
+                )
             )
-            base_tree = cast(pygit2.Tree, self.repo[new_tree_oid])
+        new_tree_oid = self._write_tree(commit.tree, tree_updates)
 
         paths = ", ".join(update.path for update in updates)
         commit_msg = message or f"Update {paths}"
-        new_commit_oid = self._new_commit(
-            commit_msg, commit, cast(pygit2.Tree, self.repo[new_tree_oid])
-        )
-        if push:
-            self._push()
+        return self._commit_tree(commit_msg, commit, new_tree_oid, push)
 
-        return str(new_commit_oid)
+    def apply_batch(
+        self, ops: list[BatchOp], message: Optional[str] = None, push=True
+    ) -> str:
+        """
+        Apply a mix of puts and deletes as one commit, then (optionally) push once.
+        Raises KeyError if a put has no content. Returns the new commit SHA.
+        """
+        commit = self._get_tip()
+
+        tree_updates = []
+        for op in ops:
+            if op.op == "delete":
+                tree_updates.append((op.path, {"type": "delete"}))
+            else:
+                if op.content is None:
+                    raise KeyError(f"Missing content for put: {op.path}")
+                if op.b64:
+                    blob = b64.b64decode(op.content)
+                else:
+                    blob = op.content.encode("utf-8")
+                tree_updates.append(
+                    (
+                        op.path,
+                        {
+                            "type": "insert",
+                            "blob_oid": self.repo.create_blob(blob),
+                            "mode": GITMODE_FILE,
+                        },
+                    )
+                )
+        new_tree_oid = self._write_tree(commit.tree, tree_updates)
+
+        paths = ", ".join(op.path for op in ops)
+        commit_msg = message or f"Update {paths}"
+        return self._commit_tree(commit_msg, commit, new_tree_oid, push)
 
     def delete(self, path: str, message: Optional[str] = None, push=True) -> str:
         """
@@ -217,20 +513,9 @@ class Remote:
         Returns the new commit SHA.
         """
         commit = self._get_tip()
-        base_tree = commit.tree
-        new_tree_oid = self._deep_update(
-            base_tree,
-            parts=[p for p in path.split("/") if p],
-            update={"type": "delete"},
-        )
+        new_tree_oid = self._write_tree(commit.tree, [(path, {"type": "delete"})])
         commit_msg = message or f"Delete {path}"
-        new_commit_oid = self._new_commit(
-            commit_msg, commit, cast(pygit2.Tree, self.repo[new_tree_oid])
-        )
-        if push:
-            self._push()
-
-        return str(new_commit_oid)
+        return self._commit_tree(commit_msg, commit, new_tree_oid, push)
 
     def move(
         self,
@@ -242,27 +527,20 @@ class Remote:
     ) -> str:
         commit = self._get_tip()
         base_tree = commit.tree
-        new_tree_oid = self._deep_update(
+        new_tree_oid = self._write_tree(
             base_tree,
-            dst_path.split("/"),
-            {
-                "type": "insert",
-                "blob_oid": self._get_file_blob(base_tree, src_path).id,
-                "mode": GITMODE_FILE,
-                "fail_if_exists": fail_if_exists,
-            },
-        )
-        new_tree_oid = self._deep_update(
-            cast(pygit2.Tree, self.repo[new_tree_oid]),
-            src_path.split("/"),
-            {"type": "delete"},
+            [
+                (
+                    dst_path,
+                    {
+                        "type": "insert",
+                        "blob_oid": self._get_file_blob(base_tree, src_path).id,
+                        "mode": GITMODE_FILE,
+                        "fail_if_exists": fail_if_exists,
+                    },
+                ),
+                (src_path, {"type": "delete"}),
+            ],
         )
-        new_commit_oid = self._new_commit(
-            message or f"Rename {src_path} to {dst_path}",
-            commit,
-            cast(pygit2.Tree, self.repo[new_tree_oid]),
-        )
-        if push:
-            self._push()
-
-        return str(new_commit_oid)
+        commit_msg = message or f"Rename {src_path} to {dst_path}"
+        return self._commit_tree(commit_msg, commit, new_tree_oid, push)
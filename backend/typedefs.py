@@ -1,29 +1,38 @@
+import msgspec
 import pydantic
-from typing import Optional
+from typing import Literal, Optional
 
 
-class FileUpdate(pydantic.BaseModel):
+# Batched updates carry many files, so these are decoded with msgspec rather than pydantic
+class FileUpdate(msgspec.Struct, frozen=True):
     path: str
     content: str
     b64: bool
-    fail_if_exists = False
-    fail_if_not_exists = False
+    fail_if_exists: bool = False
+    fail_if_not_exists: bool = False
 
 
-class UpdateFilesRequest(pydantic.BaseModel):
+class UpdateFilesRequest(msgspec.Struct, frozen=True):
     files: list[FileUpdate]
     message: Optional[str] = None
 
 
-class GetFileContentRequest(pydantic.BaseModel):
+class BatchOp(msgspec.Struct, frozen=True):
+    op: Literal["put", "delete"]
     path: str
+    # Required for "put"; a missing value must not truncate the file
+    content: Optional[str] = None
+    b64: bool = False
 
 
-class DeleteFileRequest(pydantic.BaseModel):
-    path: str
+class BatchRequest(msgspec.Struct, frozen=True):
+    ops: list[BatchOp]
+    message: Optional[str] = None
 
 
 class RenameFileRequest(pydantic.BaseModel):
+    model_config = pydantic.ConfigDict(frozen=True)
+
     src: str
     dst: str
     message: Optional[str] = None
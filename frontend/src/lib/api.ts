@@ -18,14 +18,14 @@ export function setAccessToken(token: string) {
   localStorage.setItem("access_token", token);
 }
 
-async function http<T>(input: RequestInfo, init?: RequestInit): Promise<T> {
+async function send(input: RequestInfo, init?: RequestInit): Promise<Response> {
   const res = await fetch(input, {
+    ...init,
     headers: {
       "Content-Type": "application/json",
       Authorization: "Bearer " + getAccessToken(),
       ...(init?.headers || {}),
     },
-    ...init,
   });
   if (!res.ok) {
     let detail: any = undefined;
@@ -36,6 +36,11 @@ async function http<T>(input: RequestInfo, init?: RequestInit): Promise<T> {
       detail?.error || detail?.message || `${res.status} ${res.statusText}`
     );
   }
+  return res;
+}
+
+async function http<T>(input: RequestInfo, init?: RequestInit): Promise<T> {
+  const res = await send(input, init);
   return res.json() as Promise<T>;
 }
 
@@ -43,10 +48,15 @@ export const api = {
   listFiles(): Promise<FilesResponse> {
     return http<FilesResponse>(`${BASE}/files`);
   },
-  getFile(path: string): Promise<FileContentResponse> {
-    return http<FileContentResponse>(
-      `${BASE}/file?path=${encodeURIComponent(path)}`
-    );
+  async getFile(path: string): Promise<FileContentResponse> {
+    // File content is served as raw bytes rather than wrapped in JSON. API
+    // Gateway only decodes the base64 Lambda body when Accept names a binary
+    // media type (see BinaryMediaTypes in template.yaml)
+    const res = await send(`${BASE}/file?path=${encodeURIComponent(path)}`, {
+      headers: { Accept: "application/octet-stream" },
+    });
+    const content = new TextDecoder().decode(await res.arrayBuffer());
+    return { path, content };
   },
   saveFile(req: SaveRequest): Promise<SaveResponse> {
     return http<SaveResponse>(`${BASE}/file`, {
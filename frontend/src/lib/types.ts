@@ -6,7 +6,7 @@ export interface FilesResponse {
 }
 
 export interface FileContentResponse {
-  ref: string;
+  ref?: string;
   path: string;
   content: string;
 }